@@ -0,0 +1,26 @@
+"""
+构建预编译系统镜像（sysimage），将求解器相关依赖包的加载与编译结果固化到共享库中，
+之后以 `julia --sysimage=<路径>` 启动即可跳过这部分开销。
+
+使用方法（需先在默认环境中安装 PackageCompiler：`]add PackageCompiler`）：
+    julia --project=. build_sysimage.jl [输出路径]   # 默认 ~/dn_sysimage.so
+
+依赖包版本或 Julia 版本变化后需重新构建。
+"""
+
+using Pkg
+Pkg.activate(@__DIR__)
+
+using PackageCompiler
+
+const DEFAULT_SYSIMAGE_PATH = expanduser("~/dn_sysimage.so")
+
+sysimage_path = length(ARGS) > 0 ? ARGS[1] : DEFAULT_SYSIMAGE_PATH
+
+create_sysimage(
+    [:JuMP, :Gurobi, :XLSX, :DataFrames, :JSON];
+    sysimage_path = sysimage_path,
+    precompile_execution_file = joinpath(@__DIR__, "precompile_exec.jl"),
+    project = @__DIR__,
+)
+println("系统镜像已生成：$sysimage_path")
@@ -0,0 +1,109 @@
+"""
+DN-ResilienceAssessment Julia 常驻服务
+
+启动后只加载一次工作流模块（JuMP、Gurobi、XLSX 等），后续请求复用已编译的代码，
+避免每次调用都重新支付 Julia 的包加载与 JIT 编译开销。
+
+使用方法：
+    julia --project=. daemon.jl <套接字路径>
+
+套接字路径应位于仅当前用户可访问的目录中（智能体工具每次启动服务时新建 0700 临时目录），
+避免其他本地进程向服务提交任意参数。
+
+通信协议（Unix 域套接字，每个连接一次请求）：
+    请求：一行 JSON，例如 {"args": ["--full"]}，args 与 main.jl 的命令行参数一致
+    响应：一行 JSON，{"returncode": 0, "stdout": "...", "stderr": "..."}
+          stdout/stderr 只返回末尾部分（OUTPUT_TAIL_BYTES），完整日志不驻留内存
+"""
+
+using Sockets
+using JSON
+
+include(joinpath(@__DIR__, "main.jl"))
+
+const OUTPUT_TAIL_BYTES = 64 * 1024
+
+"""
+读取文件末尾不超过 `max_bytes` 字节的内容（从完整行开始）
+"""
+function read_tail(path::AbstractString, max_bytes::Int = OUTPUT_TAIL_BYTES)
+    open(path, "r") do io
+        total = filesize(io)
+        if total <= max_bytes
+            return read(io, String)
+        end
+        seek(io, total - max_bytes)
+        readline(io)  # 丢弃被截断的首行
+        return read(io, String)
+    end
+end
+
+"""
+执行单个请求，捕获其标准输出与标准错误
+"""
+function handle_request(args::Vector{String})
+    stdout_path, stdout_io = mktemp()
+    stderr_path, stderr_io = mktemp()
+    returncode = 0
+    try
+        redirect_stdout(stdout_io) do
+            redirect_stderr(stderr_io) do
+                try
+                    main(args)
+                catch e
+                    returncode = 1
+                    showerror(stderr, e, catch_backtrace())
+                    println(stderr)
+                end
+            end
+        end
+    finally
+        close(stdout_io)
+        close(stderr_io)
+    end
+
+    response = Dict(
+        "returncode" => returncode,
+        "stdout" => read_tail(stdout_path),
+        "stderr" => read_tail(stderr_path),
+    )
+    rm(stdout_path; force = true)
+    rm(stderr_path; force = true)
+    return response
+end
+
+"""
+监听 Unix 域套接字，按顺序处理请求（各流程共享 data 目录，不能并发执行）
+"""
+function serve_daemon(socket_path::AbstractString)
+    # 清理上次异常退出遗留的套接字文件
+    ispath(socket_path) && rm(socket_path)
+    server = listen(socket_path)
+    println("Julia 常驻服务已启动，监听 $socket_path")
+    flush(stdout)
+    while true
+        sock = accept(server)
+        try
+            line = readline(sock)
+            if isempty(line)
+                continue
+            end
+            request = JSON.parse(line)
+            args = String[string(a) for a in get(request, "args", String[])]
+            response = handle_request(args)
+            write(sock, JSON.json(response), "\n")
+        catch e
+            @warn "处理请求失败" exception = (e, catch_backtrace())
+        finally
+            close(sock)
+        end
+    end
+end
+
+if abspath(PROGRAM_FILE) == @__FILE__
+    if length(ARGS) != 1
+        println(stderr, "用法：julia --project=. daemon.jl <套接字路径>")
+        exit(1)
+    end
+    serve_daemon(ARGS[1])
+end
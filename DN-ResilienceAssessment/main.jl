@@ -13,6 +13,8 @@ DN-ResilienceAssessment 配电网韧性评估系统 - Julia主入口
     julia main.jl --reconfig         # 滚动拓扑重构
     julia main.jl --dispatch         # MESS协同调度
     julia main.jl --typhoon          # 台风场景生成菜单
+    julia main.jl --full             # 完整流程
+    julia main.jl --from-stage=2     # 完整流程，从指定步骤开始
 """
 
 using Pkg
@@ -28,11 +30,13 @@ println("模块加载完成")
 
 """
 主函数
+
+`args` 默认为命令行参数，常驻服务（daemon.jl）调用时传入请求中的参数。
 """
-function main()
+function main(args::Vector{String} = ARGS)
     # 解析命令行参数
-    if length(ARGS) > 0
-        arg = ARGS[1]
+    if length(args) > 0
+        arg = args[1]
         if arg == "--classify"
             run_classify_phases()
         elseif arg == "--reconfig"
@@ -61,13 +65,15 @@ if project_root not in sys.path:
 os.chdir(project_root)
 """
 
-                command = length(ARGS) > 1 ? join(ARGS[2:end], " ") : ""
+                command = length(args) > 1 ? join(args[2:end], " ") : ""
                 run_typhoon_workflow(command = command)
             catch e
                 println("错误：台风场景生成需要 PyCall，但 PyCall 安装失败：$e")
             end
         elseif arg == "--full"
             run_full_pipeline()
+        elseif startswith(arg, "--from-stage=")
+            run_full_pipeline(from_stage = parse(Int, split(arg, "=", limit = 2)[2]))
         elseif arg == "--help" || arg == "-h"
             show_help()
         else
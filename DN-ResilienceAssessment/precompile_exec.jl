@@ -0,0 +1,27 @@
+# 构建系统镜像时执行的预编译负载（见 build_sysimage.jl）
+# 覆盖工作流模块加载与常用的表格读写、模型构建路径，不调用求解器，构建时无需 Gurobi 许可证
+
+using DataFrames
+using XLSX
+using JSON
+using JuMP
+
+include(joinpath(@__DIR__, "src", "workflows.jl"))
+
+let dir = mktempdir()
+    df = DataFrame(Scenario = [1, 2], Objective = [missing, 1.5], Status = ["OPTIMAL", "OPTIMAL"])
+    xlsx_path = joinpath(dir, "precompile.xlsx")
+    XLSX.openxlsx(xlsx_path, mode = "w") do workbook
+        Workflows.write_dataframe_sheet(workbook, "Data", df)
+    end
+    DataFrame(XLSX.readtable(xlsx_path, "Data"))
+    Workflows.write_table_sidecar(xlsx_path, Dict("Data" => df))
+    Workflows.read_table_sidecar(xlsx_path, "Data")
+    rm(dir; recursive = true, force = true)
+end
+
+let model = Model()
+    @variable(model, 0 <= x[1:3] <= 1, Bin)
+    @constraint(model, sum(x) <= 2)
+    @objective(model, Max, sum(x))
+end
@@ -3,10 +3,14 @@ using Gurobi
 using Base: error
 
 const QUIET_GUROBI_IO = devnull
+# redirect_stdout is process-wide, so serialize it across solver threads
+const QUIET_GUROBI_LOCK = ReentrantLock()
 
-quiet_gurobi(f) = redirect_stdout(QUIET_GUROBI_IO) do
-    redirect_stderr(QUIET_GUROBI_IO) do
-        return f()
+quiet_gurobi(f) = lock(QUIET_GUROBI_LOCK) do
+    redirect_stdout(QUIET_GUROBI_IO) do
+        redirect_stderr(QUIET_GUROBI_IO) do
+            return f()
+        end
     end
 end
 #=
@@ -67,6 +71,10 @@ function solve_milp_sparse(
     error = quiet_gurobi(() -> GRBsetparam(env, "FeasibilityTol", "1e-9"))
     error = quiet_gurobi(() -> GRBsetparam(env, "IntFeasTol", "1e-9"))
     error = quiet_gurobi(() -> GRBsetparam(env, "OptimalityTol", "1e-9"))
+    # Use one Gurobi thread per model when scenarios are solved on parallel Julia threads
+    if Threads.nthreads() > 1
+        error = quiet_gurobi(() -> GRBsetparam(env, "Threads", "1"))
+    end
 
     # Create a new model
     model_p = Ref{Ptr{Cvoid}}()
@@ -428,6 +436,10 @@ function solve_milp_dual(
     error = quiet_gurobi(() -> GRBsetparam(env, "FeasibilityTol", "1e-9"))
     error = quiet_gurobi(() -> GRBsetparam(env, "IntFeasTol", "1e-9"))
     error = quiet_gurobi(() -> GRBsetparam(env, "OptimalityTol", "1e-9"))
+    # Use one Gurobi thread per model when scenarios are solved on parallel Julia threads
+    if Threads.nthreads() > 1
+        error = quiet_gurobi(() -> GRBsetparam(env, "Threads", "1"))
+    end
 
     # Create a new model
     model_p = Ref{Ptr{Cvoid}}()
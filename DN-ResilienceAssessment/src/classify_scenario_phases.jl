@@ -1,6 +1,8 @@
 using DataFrames
 using XLSX
 
+include(joinpath(@__DIR__, "utils", "table_sidecar.jl"))
+
 function column_letter_to_index(letter::AbstractString)
     letter = uppercase(letter)
     result = 0
@@ -233,15 +235,8 @@ end
 
 function write_dataframe_sheet(workbook, sheet_name::String, df::DataFrame)
     sheet = XLSX.addsheet!(workbook, sheet_name)
-    for (col_idx, col_name) in enumerate(names(df))
-        XLSX.setdata!(sheet, 1, col_idx, string(col_name))
-    end
-    for row_idx in 1:nrow(df)
-        for col_idx in 1:ncol(df)
-            # Ensure missing values are preserved
-            XLSX.setdata!(sheet, row_idx + 1, col_idx, df[row_idx, col_idx])
-        end
-    end
+    # 按列整体写入（含表头，missing 写为空单元格），代替逐单元格 setdata!
+    XLSX.writetable!(sheet, df)
     return sheet
 end
 
@@ -289,6 +284,7 @@ function write_phase_report(output_path::AbstractString, detail_df::DataFrame, s
             copy_named_sheet!(workbook, cluster_summary_source, cluster_summary_sheet)
         end
     end
+    write_table_sidecar(output_path, Dict("StageDetails" => detail_df, "ScenarioSummary" => summary_df))
 end
 
 function classify_phases(;input_path::AbstractString,
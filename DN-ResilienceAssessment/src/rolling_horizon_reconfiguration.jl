@@ -4,7 +4,9 @@ using XLSX
 using Logging
 using Dates
 
-# 注意：utils 文件已在 workflows.jl 中统一加载，这里不再重复加载
+# 注意：utils 文件已在 workflows.jl 中统一加载，这里不再重复加载；
+# 表格伴随文件工具本文件直接调用，与 classify_scenario_phases.jl 一样自行加载
+include(joinpath(@__DIR__, "utils", "table_sidecar.jl"))
 include(joinpath(@__DIR__, "three_stage_tp_model.jl"))
 
 const DEFAULT_CASE_FILE = joinpath(@__DIR__, "..", "data", "ac_dc_real_case.xlsx")
@@ -250,7 +252,10 @@ end
 
 function build_stage_schedule(stage_file::AbstractString, stage_sheet::AbstractString,
         scenario_count::Int, n_steps::Int)
-    df = DataFrame(XLSX.readtable(stage_file, stage_sheet))
+    df = read_table_sidecar(stage_file, stage_sheet)
+    if df === nothing
+        df = DataFrame(XLSX.readtable(stage_file, stage_sheet))
+    end
     scenario_col = find_column_name(df, ["Scenario", "scenario"])
     time_col = find_column_name(df, ["TimeStep", "Time", "Timesteps", "时间"])
     stage_col = find_column_name(df, ["Stage", "stage"])
@@ -273,14 +278,8 @@ end
 
 function write_dataframe_sheet(workbook, sheet_name::String, df::DataFrame)
     sheet = XLSX.addsheet!(workbook, sheet_name)
-    for (col_idx, col_name) in enumerate(names(df))
-        XLSX.setdata!(sheet, 1, col_idx, string(col_name))
-    end
-    for row_idx in 1:nrow(df)
-        for col_idx in 1:ncol(df)
-            XLSX.setdata!(sheet, row_idx + 1, col_idx, df[row_idx, col_idx])
-        end
-    end
+    # 按列整体写入（含表头，missing 写为空单元格），代替逐单元格 setdata!
+    XLSX.writetable!(sheet, df)
     return sheet
 end
 
@@ -343,6 +342,73 @@ function write_reconfiguration_report(output_path::AbstractString, template_path
     end
 end
 
+"""
+对单个场景逐时间步求解三阶段拓扑重构，各场景之间互不依赖，可在线程中并行调用
+"""
+function solve_scenario_rolling(jpc, scenario_block::AbstractMatrix, stage_row::AbstractVector,
+        baseline_result, scenario::Int, total_lines::Int, n_steps::Int)
+    stages = zeros(Int, n_steps)
+    fault_counts = zeros(Int, n_steps)
+    objectives = Vector{Union{Missing, Float64}}(missing, n_steps)
+    statuses = Vector{Union{Missing, String}}(missing, n_steps)
+    betas = zeros(Int, total_lines, n_steps)
+    last_stage1 = nothing
+    last_stage2 = nothing
+    for t in 1:n_steps
+        step_vector = scenario_block[:, t]
+        fault_lines = findall(x -> x == 1, step_vector)
+        stage = clamp(stage_row[t], 0, 3)
+        println("  运行日志 -> 场景 $scenario, 时间步 $t, 阶段 $(stage_label(stage)), 故障数量 $(length(fault_lines))")
+        stage_result = nothing
+        stage_obj = missing
+        stage_status = missing
+        if stage == 0
+            stage_result = baseline_result
+            stage_status = get(stage_result, :status, missing)
+        elseif stage == 1
+            last_stage1 = solve_fault_isolation(jpc, fault_lines)
+            stage_result = last_stage1
+            stage_obj = get(last_stage1, :objective, missing)
+            stage_status = get(last_stage1, :status, missing)
+        elseif stage == 2
+            if last_stage1 === nothing
+                last_stage1 = solve_fault_isolation(jpc, fault_lines)
+            end
+            last_stage2 = solve_post_fault_reconfig(jpc, last_stage1)
+            stage_result = last_stage2
+            stage_status = get(last_stage2, :status, missing)
+        elseif stage == 3
+            if last_stage1 === nothing
+                last_stage1 = solve_fault_isolation(jpc, fault_lines)
+            end
+            if last_stage2 === nothing
+                last_stage2 = solve_post_fault_reconfig(jpc, last_stage1)
+            end
+            stage_result = solve_post_repair_reconfig(jpc, fault_lines, last_stage1, last_stage2)
+            stage_obj = get(stage_result, :objective, missing)
+            stage_status = get(stage_result, :status, missing)
+        else
+            @warn "未识别的阶段" stage=stage
+        end
+        decision_beta = stage_result === nothing ? zeros(Int, total_lines) : begin
+            beta_key = stage == 0 ? :β0 : stage == 1 ? :β1 : stage == 2 ? :β2 : :β3
+            beta_vector = get(stage_result, beta_key, zeros(total_lines))
+            Int.(clamp01.(round.(beta_vector)))
+        end
+        if length(decision_beta) != total_lines
+            @warn "Beta vector length mismatch" total_length=total_lines beta_length=length(decision_beta)
+            decision_beta = resize!(Vector{Int}(decision_beta), total_lines)
+        end
+        stages[t] = stage
+        fault_counts[t] = sum(step_vector)
+        objectives[t] = stage_obj
+        statuses[t] = stage_status
+        betas[:, t] = decision_beta
+    end
+    return (stages = stages, fault_counts = fault_counts, objectives = objectives,
+        statuses = statuses, betas = betas)
+end
+
 function run_rolling_reconfiguration(; case_file::AbstractString = DEFAULT_CASE_FILE,
         fault_file::AbstractString = DEFAULT_FAULT_FILE,
         stage_file::AbstractString = DEFAULT_STAGE_FILE,
@@ -370,6 +436,16 @@ function run_rolling_reconfiguration(; case_file::AbstractString = DEFAULT_CASE_
     if lines_per_scenario != total_lines
         error("lines_per_scenario=$lines_per_scenario 与基础模型的线路数 $total_lines 不一致。")
     end
+    # 各场景相互独立，按场景多线程求解后再按顺序汇总
+    scenario_results = Vector{NamedTuple}(undef, scenario_count)
+    Threads.@threads for scenario in 1:scenario_count
+        println("处理中: 场景 $scenario / $scenario_count")
+        block_start = (scenario - 1) * lines_per_scenario + 1
+        block_end = scenario * lines_per_scenario
+        scenario_results[scenario] = solve_scenario_rolling(jpc, fault_matrix[block_start:block_end, :],
+            stage_schedule[scenario], baseline_result, scenario, total_lines, n_steps)
+    end
+
     scenario_col = Int[]
     time_col = Int[]
     stage_col = Int[]
@@ -381,65 +457,17 @@ function run_rolling_reconfiguration(; case_file::AbstractString = DEFAULT_CASE_
     status_tensor = Array{Int}(undef, lines_per_scenario, scenario_count, n_steps)
 
     for scenario in 1:scenario_count
-        println("处理中: 场景 $scenario / $scenario_count")
-        block_start = (scenario - 1) * lines_per_scenario + 1
-        block_end = scenario * lines_per_scenario
-        scenario_block = fault_matrix[block_start:block_end, :]
-        last_stage1 = nothing
-        last_stage2 = nothing
+        result = scenario_results[scenario]
         for t in 1:n_steps
-            step_vector = scenario_block[:, t]
-            fault_lines = findall(x -> x == 1, step_vector)
-            stage = clamp(stage_schedule[scenario][t], 0, 3)
-            println("  运行日志 -> 场景 $scenario, 时间步 $t, 阶段 $(stage_label(stage)), 故障数量 $(length(fault_lines))")
-            stage_result = nothing
-            stage_obj = missing
-            stage_status = missing
-            if stage == 0
-                stage_result = baseline_result
-                stage_status = get(stage_result, :status, missing)
-            elseif stage == 1
-                last_stage1 = solve_fault_isolation(jpc, fault_lines)
-                stage_result = last_stage1
-                stage_obj = get(last_stage1, :objective, missing)
-                stage_status = get(last_stage1, :status, missing)
-            elseif stage == 2
-                if last_stage1 === nothing
-                    last_stage1 = solve_fault_isolation(jpc, fault_lines)
-                end
-                last_stage2 = solve_post_fault_reconfig(jpc, last_stage1)
-                stage_result = last_stage2
-                stage_status = get(last_stage2, :status, missing)
-            elseif stage == 3
-                if last_stage1 === nothing
-                    last_stage1 = solve_fault_isolation(jpc, fault_lines)
-                end
-                if last_stage2 === nothing
-                    last_stage2 = solve_post_fault_reconfig(jpc, last_stage1)
-                end
-                stage_result = solve_post_repair_reconfig(jpc, fault_lines, last_stage1, last_stage2)
-                stage_obj = get(stage_result, :objective, missing)
-                stage_status = get(stage_result, :status, missing)
-            else
-                @warn "未识别的阶段" stage=stage
-            end
-            decision_beta = stage_result === nothing ? zeros(Int, total_lines) : begin
-                beta_key = stage == 0 ? :β0 : stage == 1 ? :β1 : stage == 2 ? :β2 : :β3
-                beta_vector = get(stage_result, beta_key, zeros(total_lines))
-                Int.(clamp01.(round.(beta_vector)))
-            end
-            if length(decision_beta) != total_lines
-                @warn "Beta vector length mismatch" total_length=total_lines beta_length=length(decision_beta)
-                decision_beta = resize!(Vector{Int}(decision_beta), total_lines)
-            end
             push!(scenario_col, scenario)
             push!(time_col, t)
-            push!(stage_col, stage)
-            push!(stage_label_col, stage_label(stage))
-            push!(fault_count_col, sum(step_vector))
-            push!(objective_col, stage_obj)
-            push!(status_col, stage_status)
-            for (i, value) in enumerate(decision_beta)
+            push!(stage_col, result.stages[t])
+            push!(stage_label_col, stage_label(result.stages[t]))
+            push!(fault_count_col, result.fault_counts[t])
+            push!(objective_col, result.objectives[t])
+            push!(status_col, result.statuses[t])
+            for i in 1:total_lines
+                value = result.betas[i, t]
                 push!(line_buffers[i], value)
                 status_tensor[i, scenario, t] = value
             end
@@ -477,6 +505,7 @@ function run_rolling_reconfiguration(; case_file::AbstractString = DEFAULT_CASE_
         cluster_summary_source=fault_file,
         cluster_summary_sheet="cluster_summary")
     color_stage_font_via_python(output_file, stage_schedule, scenario_count, lines_per_scenario, n_steps)
+    write_table_sidecar(output_file, Dict("RollingDecisionsOriginal" => results_df))
     println("滚动拓扑重构完成，结果已写入：", output_file)
     return results_df
 end
@@ -0,0 +1,48 @@
+using DataFrames
+using JSON
+
+"""
+    table_sidecar_path(xlsx_path)
+
+结果工作簿对应的列式 JSON 伴随文件路径（同名 .json）。
+"""
+table_sidecar_path(xlsx_path::AbstractString) = splitext(xlsx_path)[1] * ".json"
+
+"""
+    write_table_sidecar(xlsx_path, tables)
+
+将供程序读取的结果表按列写入伴随文件，格式为
+`{"工作表名": {"columns": [列名...], "data": [[列1...], [列2...], ...]}}`。
+Excel 工作簿仍保留给用户查看，后续阶段和智能体优先读取该文件，避免解析 xlsx。
+需在工作簿最终写完之后调用，读取时以修改时间判断伴随文件是否过期。
+"""
+function write_table_sidecar(xlsx_path::AbstractString, tables::AbstractDict{String, DataFrame})
+    payload = Dict(
+        sheet_name => Dict(
+            "columns" => names(df),
+            "data" => [collect(col) for col in eachcol(df)],
+        )
+        for (sheet_name, df) in tables
+    )
+    open(table_sidecar_path(xlsx_path), "w") do io
+        JSON.print(io, payload)
+    end
+end
+
+"""
+    read_table_sidecar(xlsx_path, sheet_name)
+
+读取伴随文件中的指定表；伴随文件不存在、早于工作簿或缺少该表时返回 `nothing`。
+"""
+function read_table_sidecar(xlsx_path::AbstractString, sheet_name::AbstractString)
+    sidecar_path = table_sidecar_path(xlsx_path)
+    if !isfile(sidecar_path) || !isfile(xlsx_path) || mtime(sidecar_path) < mtime(xlsx_path)
+        return nothing
+    end
+    table = get(JSON.parsefile(sidecar_path), sheet_name, nothing)
+    if table === nothing
+        return nothing
+    end
+    columns = [replace(col, nothing => missing) for col in table["data"]]
+    return DataFrame(columns, String.(table["columns"]))
+end
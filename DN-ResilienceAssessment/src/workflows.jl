@@ -216,16 +216,30 @@ function show_menu()
     print("请输入选项 [1-5/q]: ")
 end
 
-function run_full_pipeline()
+"""
+运行完整流程；`from_stage` 指定起始步骤（1-3），之前步骤的输出文件须已存在且有效
+"""
+function run_full_pipeline(; from_stage::Int = 1)
+    if !(1 <= from_stage <= 3)
+        error("起始步骤必须在 1-3 之间，当前为 $from_stage")
+    end
     println("\n" * "="^60)
-    println("运行完整流程")
+    println(from_stage == 1 ? "运行完整流程" : "运行完整流程（从步骤 $from_stage 开始）")
     println("="^60)
 
-    println("\n[步骤 1/3] 场景阶段分类...")
-    run_classify_phases()
+    if from_stage <= 1
+        println("\n[步骤 1/3] 场景阶段分类...")
+        run_classify_phases()
+    else
+        println("\n[步骤 1/3] 场景阶段分类：沿用已有结果")
+    end
 
-    println("\n[步骤 2/3] 滚动拓扑重构...")
-    run_rolling_reconfig()
+    if from_stage <= 2
+        println("\n[步骤 2/3] 滚动拓扑重构...")
+        run_rolling_reconfig()
+    else
+        println("\n[步骤 2/3] 滚动拓扑重构：沿用已有结果")
+    end
 
     println("\n[步骤 3/3] MESS协同调度...")
     run_mess_dispatch()
@@ -245,6 +259,7 @@ function show_help()
     julia main.jl --typhoon          # 台风场景生成（交互式）
     julia main.jl --typhoon typhoon  # 台风场景生成（指定子命令）
     julia main.jl --full             # 完整流程
+    julia main.jl --from-stage=2     # 完整流程，从指定步骤开始（沿用之前步骤的输出）
     julia main.jl --help             # 显示帮助
     """)
 end
@@ -11,3 +11,13 @@ pip install -r requirements.txt
 pip install -U "coze-coding-dev-sdk>=0.5.0,<1.0"
 
 # 安装系统依赖
+
+# 构建 Julia 系统镜像（可选，缺少 Julia 或 PackageCompiler 时跳过）
+JULIA_BIN="${HOME}/julia-1.11.7/bin/julia"
+if [ ! -x "$JULIA_BIN" ]; then
+    JULIA_BIN="$(command -v julia || true)"
+fi
+if [ -n "$JULIA_BIN" ]; then
+    (cd DN-ResilienceAssessment && "$JULIA_BIN" --project=. build_sysimage.jl "${HOME}/dn_sysimage.so") \
+        || echo "警告：Julia 系统镜像构建失败，将以常规方式启动 Julia"
+fi
@@ -9,35 +9,90 @@
 
 import os
 import json
+import functools
 from typing import Annotated
-from langchain.agents import create_agent
-from langchain_openai import ChatOpenAI
-from langgraph.graph import MessagesState
-from langgraph.graph.message import add_messages
-from langchain_core.messages import AnyMessage
 from coze_coding_utils.runtime_ctx.context import default_headers
-from storage.memory.memory_saver import get_memory_saver
-
-# 导入工具
-from tools.resilience_assessment_tool import run_resilience_assessment, check_data_status
 
 LLM_CONFIG = "config/agent_llm_config.json"
 
+# 模型接入配置在进程生命周期内不变，导入时读取一次
+_API_KEY = os.getenv("COZE_WORKLOAD_IDENTITY_API_KEY")
+_BASE_URL = os.getenv("COZE_INTEGRATION_MODEL_BASE_URL")
+
 # 默认保留最近 20 轮对话 (40 条消息)
 MAX_MESSAGES = 40
 
 def _windowed_messages(old, new):
     """滑动窗口: 只保留最近 MAX_MESSAGES 条消息"""
+    from langgraph.graph.message import add_messages
+    
     result = add_messages(old, new)
-    # 确保返回列表，并进行切片
-    if isinstance(result, list):
-        return result[-MAX_MESSAGES:]
-    else:
+    if not isinstance(result, list):
         # 如果返回的是单个消息，包装成列表
-        return [result][-MAX_MESSAGES:]
+        return [result]
+    # add_messages 返回的是新列表，超出窗口时原地删除头部，避免切片再复制一份
+    if len(result) > MAX_MESSAGES:
+        del result[:-MAX_MESSAGES]
+    return result
 
-class AgentState(MessagesState):
-    messages: Annotated[list[AnyMessage], _windowed_messages]
+@functools.lru_cache(maxsize=1)
+def _load_llm_cfg():
+    """读取并缓存 LLM 配置，修改配置文件后调用 _load_llm_cfg.cache_clear() 重新加载"""
+    workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
+    config_path = os.path.join(workspace_path, LLM_CONFIG)
+    
+    with open(config_path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+@functools.cache
+def _get_http_clients():
+    """进程内共享的同步/异步 HTTP 客户端，各会话的 ChatOpenAI 复用同一连接池"""
+    from openai import DefaultHttpxClient, DefaultAsyncHttpxClient
+    
+    return DefaultHttpxClient(), DefaultAsyncHttpxClient()
+
+def _get_llm(model, temperature, timeout, thinking, headers):
+    """
+    创建 ChatOpenAI 实例。
+    
+    请求头包含每次请求不同的 logid，实例按请求创建；底层连接池通过共享的 HTTP 客户端复用。
+    """
+    from langchain_openai import ChatOpenAI
+    
+    http_client, http_async_client = _get_http_clients()
+    return ChatOpenAI(
+        model=model,
+        api_key=_API_KEY,
+        base_url=_BASE_URL,
+        temperature=temperature,
+        streaming=True,
+        timeout=timeout,
+        extra_body={
+            "thinking": {
+                "type": thinking
+            }
+        },
+        default_headers=headers,
+        http_client=http_client,
+        http_async_client=http_async_client
+    )
+
+@functools.cache
+def _get_state_cls():
+    """
+    构建带滑动窗口 reducer 的智能体状态类。
+    
+    LangGraph 相关依赖较重，推迟到首次构建智能体时导入，结果缓存，只定义一次。
+    messages 的 Annotated 注解（含 reducer）随之只在首次调用时解析一次，
+    LangGraph 在编译图时读取 reducer，之后各节点步骤不再解析注解。
+    """
+    from langgraph.graph import MessagesState
+    from langchain_core.messages import AnyMessage
+    
+    class AgentState(MessagesState):
+        messages: Annotated[list[AnyMessage], _windowed_messages]
+    
+    return AgentState
 
 def build_agent(ctx=None):
     """
@@ -48,28 +103,19 @@ def build_agent(ctx=None):
     2. 自动按顺序执行场景阶段分类、拓扑重构、MESS 协同调度
     3. 返回评估结果和输出文件
     """
-    workspace_path = os.getenv("COZE_WORKSPACE_PATH", "/workspace/projects")
-    config_path = os.path.join(workspace_path, LLM_CONFIG)
-    
-    with open(config_path, 'r', encoding='utf-8') as f:
-        cfg = json.load(f)
+    from langchain.agents import create_agent
+    from storage.memory.memory_saver import get_memory_saver
+    # 工具模块在导入时依赖 langchain.tools（进而导入 langgraph.prebuilt），同样推迟导入
+    from tools.resilience_assessment_tool import run_resilience_assessment, check_data_status
     
-    api_key = os.getenv("COZE_WORKLOAD_IDENTITY_API_KEY")
-    base_url = os.getenv("COZE_INTEGRATION_MODEL_BASE_URL")
+    cfg = _load_llm_cfg()
     
-    llm = ChatOpenAI(
+    llm = _get_llm(
         model=cfg['config'].get("model"),
-        api_key=api_key,
-        base_url=base_url,
         temperature=cfg['config'].get('temperature', 0.7),
-        streaming=True,
         timeout=cfg['config'].get('timeout', 600),
-        extra_body={
-            "thinking": {
-                "type": cfg['config'].get('thinking', 'disabled')
-            }
-        },
-        default_headers=default_headers(ctx) if ctx else {}
+        thinking=cfg['config'].get('thinking', 'disabled'),
+        headers=default_headers(ctx) if ctx else {},
     )
     
     # 定义可用工具
@@ -83,5 +129,5 @@ def build_agent(ctx=None):
         system_prompt=cfg.get("sp"),
         tools=tools,
         checkpointer=get_memory_saver(),
-        state_schema=AgentState,
+        state_schema=_get_state_cls(),
     )